@@ -1,9 +1,710 @@
+import time
+_START_TIME = time.perf_counter()
+
+import argparse
+import io
+import sys
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, messagebox
 import json
 import os
-from PIL import Image, ImageTk, ImageDraw, ImageFont
 import math
+import posixpath
+
+# Pillow (and its Tk bridge) and NumPy are imported on first use in the
+# functions that need them, so the window can be shown before the imaging
+# stack is loaded.
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif']
+FONT_FAMILIES = ["Arial", "Times New Roman", "Courier New", "Helvetica", "Verdana"]
+TEXT_COLORS = ["black", "white", "red", "blue", "green", "yellow", "orange", "purple"]
+
+# Pillow modes holding more than 8 bits per sample
+HIGH_BIT_DEPTH_MODES = ('I;16', 'I;16L', 'I;16B', 'I;16N', 'I', 'F')
+# Images larger than this are shown as a decimated preview, which keeps
+# window/level re-renders and redraws interactive
+MAX_DISPLAY_PIXELS = 16_000_000
+# Delay used to coalesce window/level slider motion into one re-render
+WINDOW_UPDATE_DELAY_MS = 50
+# Bytes of encoded TIFF segments read from disk at a time for previews
+TIFF_READ_BUFFER_SIZE = 4_000_000
+# Percentiles used for the automatic window
+AUTO_WINDOW_PERCENTILES = (1.0, 99.5)
+
+def file_stat(path):
+    """Return (mtime_ns, size) of a file, or None if it cannot be read"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def make_pair(folder, base_name, names):
+    """Build the image-JSON pair for base_name if both files are in names"""
+    json_file = base_name + '.json'
+    if json_file not in names:
+        return None
+    for ext in IMAGE_EXTENSIONS:
+        image_file = base_name + ext
+        if image_file in names:
+            return {
+                'image': os.path.join(folder, image_file),
+                'json': os.path.join(folder, json_file),
+                'name': base_name
+            }
+    return None
+
+class FolderSnapshot:
+    """Directory listing that can be refreshed incrementally.
+
+    The folder's own mtime is checked on every poll and the listing is only
+    re-read when it changes, i.e. when entries are added, removed or
+    renamed. Entries are compared by name only, so no file is stat'ed.
+    """
+    
+    def __init__(self, folder):
+        self.folder = folder
+        self.dir_mtime = None
+        self.entries = {}  # name -> None, an ordered set of file names
+        self.poll()
+        
+    def poll(self):
+        """Return the (added, removed) entry names since the last poll"""
+        try:
+            dir_mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        if dir_mtime == self.dir_mtime:
+            return set(), set()
+        self.dir_mtime = dir_mtime
+        
+        try:
+            listing = [entry.name for entry in os.scandir(self.folder) if entry.is_file()]
+        except OSError:
+            listing = []
+        added = set(listing) - self.entries.keys()
+        removed = self.entries.keys() - set(listing)
+        # Keep the existing order and append new entries
+        entries = {name: None for name in self.entries if name not in removed}
+        entries.update((name, None) for name in listing if name in added)
+        self.entries = entries
+        return added, removed
+
+def is_archive(path):
+    """Return True if path is a zip or tar file"""
+    import tarfile
+    import zipfile
+    
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+class FileSlice(io.RawIOBase):
+    """Read-only file object for a byte range of a file, such as a tar member"""
+    
+    def __init__(self, path, offset, size):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._position = 0
+        
+    def readable(self):
+        return True
+        
+    def seekable(self):
+        return True
+        
+    def readinto(self, buffer):
+        count = min(len(buffer), self._size - self._position)
+        if count <= 0:
+            return 0
+        self._file.seek(self._offset + self._position)
+        count = self._file.readinto(memoryview(buffer)[:count])
+        self._position += count
+        return count
+        
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self._size
+        self._position = max(0, position)
+        return self._position
+        
+    def tell(self):
+        return self._position
+        
+    def close(self):
+        self._file.close()
+        super().close()
+
+class ArchiveDataset:
+    """Image-JSON pairs read directly from a zip or tar archive.
+
+    The member list is indexed once when the archive is opened. Zip members
+    are read through the archive's own central directory. For uncompressed
+    tar files the data offset of every member is cached in a sidecar
+    ``<archive>.index.json`` so later opens do not scan the archive, and
+    members are read with a single seek. Compressed tar files are read
+    through tarfile.
+
+    Saved JSON files go to an overlay directory mirroring the member paths
+    and take precedence over the archive members when read.
+    """
+    
+    def __init__(self, path, overlay_dir=None):
+        self.path = path
+        self.overlay_dir = overlay_dir or path + '.overlay'
+        self._open()
+        
+    def _open(self):
+        import tarfile
+        import zipfile
+        
+        self.zip_file = None
+        self.tar_file = None
+        self.tar_members = {}  # name -> TarInfo (compressed tar)
+        self.tar_offsets = {}  # name -> (offset, size) (uncompressed tar)
+        
+        if zipfile.is_zipfile(self.path):
+            self.zip_file = zipfile.ZipFile(self.path)
+            self.members = [info.filename for info in self.zip_file.infolist() if not info.is_dir()]
+        else:
+            self.tar_offsets = self._load_tar_index()
+            if self.tar_offsets is None:
+                self.tar_offsets = {}
+                self.tar_file = tarfile.open(self.path)
+                self.tar_members = {info.name: info for info in self.tar_file.getmembers()
+                                    if info.isfile()}
+                self.members = list(self.tar_members)
+            else:
+                self.members = list(self.tar_offsets)
+                
+    def close(self):
+        if self.zip_file:
+            self.zip_file.close()
+        if self.tar_file:
+            self.tar_file.close()
+            
+    def _index_path(self):
+        return self.path + '.index.json'
+        
+    def _load_tar_index(self):
+        """Return the cached {name: (offset, size)} of an uncompressed tar, building it if needed"""
+        import tarfile
+        
+        archive_stat = file_stat(self.path)
+        try:
+            with open(self._index_path(), 'r') as f:
+                index = json.load(f)
+            if tuple(index['stat']) == archive_stat:
+                return {name: tuple(entry) for name, entry in index['members'].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        try:
+            with tarfile.open(self.path, 'r:') as tar:
+                offsets = {info.name: (info.offset_data, info.size) for info in tar.getmembers()
+                           if info.isfile()}
+        except tarfile.ReadError:
+            # Compressed tar: members cannot be read by offset
+            return None
+        
+        try:
+            with open(self._index_path(), 'w') as f:
+                json.dump({'stat': archive_stat, 'members': offsets}, f)
+        except OSError:
+            pass  # read-only location; the index is rebuilt next time
+        return offsets
+        
+    def pairs(self):
+        """Pair JSON and image members with the same path apart from the extension"""
+        names = set(self.members)
+        pairs = []
+        for member in self.members:
+            if member.endswith('.json'):
+                pair = make_pair('', posixpath.splitext(member)[0], names)
+                if pair:
+                    pair['name'] = posixpath.basename(pair['name'])
+                    pairs.append(pair)
+        return pairs
+        
+    def overlay_path(self, member):
+        """Path of the overlay file that shadows a member"""
+        member = posixpath.normpath(member).lstrip('/')
+        if member.startswith('..'):
+            raise ValueError(f"Unsafe archive member name: {member}")
+        return os.path.join(self.overlay_dir, *member.split('/'))
+        
+    def read_member(self, member):
+        """Return the bytes of a member from the archive"""
+        if self.zip_file:
+            return self.zip_file.read(member)
+        if member in self.tar_offsets:
+            offset, size = self.tar_offsets[member]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                return f.read(size)
+        with self.tar_file.extractfile(self.tar_members[member]) as f:
+            return f.read()
+            
+    def open_member(self, member):
+        """Return a seekable binary file object for a member.
+
+        The member is read on demand rather than loaded in full, so large
+        TIFFs can still be read strip by strip.
+        """
+        if self.zip_file:
+            return self.zip_file.open(member)
+        if member in self.tar_offsets:
+            offset, size = self.tar_offsets[member]
+            return io.BufferedReader(FileSlice(self.path, offset, size))
+        return self.tar_file.extractfile(self.tar_members[member])
+        
+    def read_json(self, member):
+        overlay = self.overlay_path(member)
+        if os.path.exists(overlay):
+            with open(overlay, 'r') as f:
+                return json.load(f)
+        return json.loads(self.read_member(member))
+        
+    def write_json(self, member, data):
+        overlay = self.overlay_path(member)
+        os.makedirs(os.path.dirname(overlay), exist_ok=True)
+        with open(overlay, 'w') as f:
+            json.dump(data, f, indent=2)
+            
+    def rebuild(self, output_path):
+        """Write a copy of the archive with overlay files in place of the original members.
+
+        Returns the number of members replaced. output_path may be the
+        archive itself; the copy is written next to it and moved into place.
+        """
+        import copy
+        import shutil
+        import tarfile
+        import zipfile
+        
+        def overlay_data(member):
+            overlay = self.overlay_path(member)
+            if not os.path.exists(overlay):
+                return None
+            with open(overlay, 'rb') as f:
+                return f.read()
+        
+        temp_path = output_path + '.tmp'
+        replaced = 0
+        try:
+            if self.zip_file:
+                with zipfile.ZipFile(temp_path, 'w') as out:
+                    for info in self.zip_file.infolist():
+                        # Writing updates the ZipInfo, so keep the source entries intact
+                        out_info = copy.copy(info)
+                        data = None if info.is_dir() else overlay_data(info.filename)
+                        if data is not None:
+                            out.writestr(out_info, data)
+                            replaced += 1
+                        elif info.is_dir():
+                            out.writestr(out_info, b'')
+                        else:
+                            # Stream unchanged members instead of loading them
+                            force_zip64 = info.file_size >= zipfile.ZIP64_LIMIT
+                            with self.zip_file.open(info) as src, \
+                                    out.open(out_info, 'w', force_zip64=force_zip64) as dst:
+                                shutil.copyfileobj(src, dst, 1024 * 1024)
+            else:
+                compression = {'.gz': 'gz', '.tgz': 'gz', '.bz2': 'bz2', '.xz': 'xz'}.get(
+                    os.path.splitext(output_path)[1].lower(), '')
+                with tarfile.open(self.path) as tar, tarfile.open(temp_path, 'w:' + compression) as out:
+                    for info in tar:
+                        if not info.isfile():
+                            out.addfile(info)
+                            continue
+                        data = overlay_data(info.name)
+                        if data is None:
+                            out.addfile(info, tar.extractfile(info))
+                        else:
+                            info.size = len(data)
+                            out.addfile(info, io.BytesIO(data))
+                            replaced += 1
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        in_place = os.path.abspath(output_path) == os.path.abspath(self.path)
+        if in_place:
+            self.close()
+        os.replace(temp_path, output_path)
+        if in_place:
+            self._open()
+        return replaced
+
+class WindowedImage:
+    """High-bit-depth pixel data displayed through an 8-bit window/level LUT.
+
+    The samples are quantized once to 16-bit codes so that changing the
+    window only rebuilds a 65536-entry lookup table and indexes it.
+    """
+    
+    LEVELS = 65536
+    
+    def __init__(self, array):
+        import numpy as np
+        
+        array = np.asarray(array)
+        if array.ndim == 3 and array.shape[-1] not in (3, 4):
+            array = array[..., 0]
+        elif array.ndim == 3 and array.shape[-1] == 4:
+            array = array[..., :3]
+        
+        finite = np.isfinite(array) if array.dtype.kind == 'f' else None
+        if finite is not None and not finite.all():
+            valid = array[finite]
+            fill = valid.min() if valid.size else 0
+            array = np.where(finite, array, fill)
+        
+        self.min_value = float(array.min()) if array.size else 0.0
+        self.max_value = float(array.max()) if array.size else 0.0
+        value_range = self.max_value - self.min_value
+        
+        if array.dtype.kind in 'ui' and value_range < self.LEVELS:
+            # Integer data that fits in 16 bits maps to codes exactly
+            self.step = 1.0
+            self.codes = (array - array.dtype.type(self.min_value)).astype(np.uint16)
+        else:
+            self.step = value_range / (self.LEVELS - 1) if value_range > 0 else 1.0
+            self.codes = np.rint((array - self.min_value) / self.step).astype(np.uint16)
+        
+        self.size = (self.codes.shape[1], self.codes.shape[0])
+        self._cumulative = None
+        self.auto_window = self.percentile_window(*AUTO_WINDOW_PERCENTILES)
+        
+    def value_to_code(self, value):
+        return min(self.LEVELS - 1, max(0, round((value - self.min_value) / self.step)))
+    
+    def code_to_value(self, code):
+        return self.min_value + code * self.step
+    
+    def percentile_window(self, low_pct, high_pct):
+        """Return the (low, high) values at the given percentiles of the image"""
+        import numpy as np
+        
+        if self._cumulative is None:
+            counts = np.bincount(self.codes.ravel(), minlength=self.LEVELS)
+            self._cumulative = np.cumsum(counts)
+        total = self._cumulative[-1]
+        if total == 0:
+            return self.min_value, self.max_value
+        low_code = int(np.searchsorted(self._cumulative, total * low_pct / 100.0))
+        high_code = int(np.searchsorted(self._cumulative, total * high_pct / 100.0))
+        return self.code_to_value(low_code), self.code_to_value(max(high_code, low_code + 1))
+    
+    def render(self, low, high):
+        """Apply the window and return an 8-bit RGB image"""
+        import numpy as np
+        from PIL import Image
+        
+        low_code = self.value_to_code(low)
+        high_code = max(self.value_to_code(high), low_code + 1)
+        lut = np.arange(self.LEVELS, dtype=np.float32)
+        lut = np.clip((lut - low_code) * (255.0 / (high_code - low_code)), 0, 255).astype(np.uint8)
+        return Image.fromarray(lut[self.codes]).convert('RGB')
+
+def read_tiff_preview(path, max_pixels=MAX_DISPLAY_PIXELS, name=None):
+    """Read a large TIFF strip by strip (or tile by tile) into a decimated array.
+
+    Returns (array, step, info) where step is the decimation factor and info
+    holds the page's 'photometric', 'colormap' and 'bitspersample' tags, or
+    None when tifffile is not installed or the image is small enough to load
+    directly. Only one decoded segment is held in memory besides the preview.
+    """
+    try:
+        import tifffile
+    except ImportError:
+        return None
+    import numpy as np
+    
+    with tifffile.TiffFile(path, name=name) as tif:
+        page = tif.pages[0]
+        height, width = page.imagelength, page.imagewidth
+        if height * width <= max_pixels:
+            return None
+        
+        step = math.ceil(math.sqrt(height * width / max_pixels))
+        samples = page.samplesperpixel
+        preview = np.zeros((-(-height // step), -(-width // step), samples), dtype=page.dtype)
+        
+        for segment, indices, shape in page.segments(maxworkers=1,
+                                                      buffersize=TIFF_READ_BUFFER_SIZE):
+            if segment is None:
+                continue
+            sample, _, y0, x0, _ = indices
+            row_offset = (-y0) % step
+            col_offset = (-x0) % step
+            part = segment[0, row_offset::step, col_offset::step, :]
+            top = (y0 + row_offset) // step
+            left = (x0 + col_offset) // step
+            part = part[:preview.shape[0] - top, :preview.shape[1] - left]
+            preview[top:top + part.shape[0], left:left + part.shape[1],
+                    sample:sample + part.shape[2]] = part
+    
+        # Read while the file is open; tifffile loads some tags lazily
+        info = {
+            'photometric': int(page.photometric),
+            'colormap': None if page.colormap is None else np.array(page.colormap),
+            'bitspersample': page.bitspersample,
+        }
+    
+    if samples == 1:
+        preview = preview[..., 0]
+    return preview, step, info
+
+def tiff_preview_to_image(array, info):
+    """Convert a decimated 8-bit TIFF preview to an RGB image.
+
+    Applies the palette and photometric interpretation from read_tiff_preview,
+    so 8-bit images keep their colors instead of going through windowing.
+    """
+    import numpy as np
+    import tifffile
+    from PIL import Image
+    
+    photometric = info['photometric']
+    if photometric == tifffile.PHOTOMETRIC.PALETTE and info['colormap'] is not None:
+        colormap = info['colormap']
+        if colormap.max() > 255:
+            colormap = colormap >> 8
+        lut = colormap.T.astype(np.uint8)
+        return Image.fromarray(lut[array.astype(np.intp)])
+    
+    if array.dtype == bool or info['bitspersample'] == 1:
+        array = array.astype(np.uint8) * 255
+    array = array.astype(np.uint8, copy=False)
+    if photometric == tifffile.PHOTOMETRIC.MINISWHITE:
+        array = 255 - array
+    
+    if array.ndim == 3:
+        if array.shape[-1] >= 3 and photometric not in (tifffile.PHOTOMETRIC.MINISBLACK,
+                                                         tifffile.PHOTOMETRIC.MINISWHITE):
+            array = array[..., :3]
+        else:
+            array = array[..., 0]
+    return Image.fromarray(np.ascontiguousarray(array)).convert('RGB')
+
+def open_display_image(path, fp=None):
+    """Open an image for display.
+
+    fp is an optional binary file object to read instead of path, which is
+    then only used for its extension. Returns (image, windowed, scale) where
+    image is an 8-bit image ready for drawing, windowed is a WindowedImage for high-bit-depth data (otherwise
+    None) and scale is the display size relative to the label coordinates.
+    """
+    from PIL import Image
+    
+    if os.path.splitext(path)[1].lower() in ('.tif', '.tiff'):
+        preview = read_tiff_preview(fp or path, name=os.path.basename(path))
+        if preview is not None:
+            array, step, info = preview
+            # Only data wider than 8 bits is windowed; palette indices never are
+            if array.dtype.itemsize == 1 or info['colormap'] is not None:
+                return tiff_preview_to_image(array, info), None, 1.0 / step
+            windowed = WindowedImage(array)
+            return windowed.render(*windowed.auto_window), windowed, 1.0 / step
+    
+    if fp is not None:
+        fp.seek(0)
+    image = Image.open(fp or path)
+    if image.mode in HIGH_BIT_DEPTH_MODES:
+        import numpy as np
+        
+        array = np.asarray(image)
+        step = 1
+        if array.shape[0] * array.shape[1] > MAX_DISPLAY_PIXELS:
+            step = math.ceil(math.sqrt(array.shape[0] * array.shape[1] / MAX_DISPLAY_PIXELS))
+            array = array[::step, ::step]
+        windowed = WindowedImage(array)
+        return windowed.render(*windowed.auto_window), windowed, 1.0 / step
+    
+    # Convert palette, grayscale and other modes once so colored labels draw
+    # correctly and redraws do not convert again
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+    else:
+        image.load()
+    return image, None, 1.0
+
+def get_point_list(json_data):
+    """Return (shape_index, label, x, y) for every point shape in LabelMe JSON data"""
+    point_list = []
+    if not json_data:
+        return point_list
+    for i, shape in enumerate(json_data.get('shapes', [])):
+        if shape.get('shape_type') == 'point' and shape.get('points'):
+            x, y = shape['points'][0]
+            point_list.append((i, shape.get('label', 'Unknown'), float(x), float(y)))
+    return point_list
+
+def _assign(distances):
+    """Minimum-cost assignment of rows to columns of a distance matrix.
+
+    Uses the Hungarian algorithm from SciPy when it is installed and a greedy
+    closest-pair-first assignment otherwise.
+    """
+    import numpy as np
+    
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        rows, cols = [], []
+        used_rows, used_cols = set(), set()
+        for flat in np.argsort(distances, axis=None):
+            row, col = divmod(int(flat), distances.shape[1])
+            if row not in used_rows and col not in used_cols:
+                used_rows.add(row)
+                used_cols.add(col)
+                rows.append(row)
+                cols.append(col)
+        return rows, cols
+    rows, cols = linear_sum_assignment(distances)
+    return rows.tolist(), cols.tolist()
+
+def match_points(gt_points, pred_points):
+    """Match predicted points to ground-truth points with the same label.
+
+    Both arguments are lists from get_point_list. Returns (matches, missed,
+    extra): matches holds (gt_point, pred_point, distance) tuples, missed the
+    unmatched ground-truth points and extra the unmatched predictions.
+    """
+    import numpy as np
+    
+    gt_by_label = {}
+    pred_by_label = {}
+    for point in gt_points:
+        gt_by_label.setdefault(point[1], []).append(point)
+    for point in pred_points:
+        pred_by_label.setdefault(point[1], []).append(point)
+    
+    matches, missed, extra = [], [], []
+    for label, gt_group in gt_by_label.items():
+        pred_group = pred_by_label.pop(label, [])
+        if not pred_group:
+            missed.extend(gt_group)
+            continue
+        gt_xy = np.array([p[2:] for p in gt_group])
+        pred_xy = np.array([p[2:] for p in pred_group])
+        distances = np.linalg.norm(gt_xy[:, None, :] - pred_xy[None, :, :], axis=2)
+        rows, cols = _assign(distances)
+        for row, col in zip(rows, cols):
+            matches.append((gt_group[row], pred_group[col], float(distances[row, col])))
+        missed.extend(p for i, p in enumerate(gt_group) if i not in rows)
+        extra.extend(p for i, p in enumerate(pred_group) if i not in cols)
+    for pred_group in pred_by_label.values():
+        extra.extend(pred_group)
+    return matches, missed, extra
+
+def compare_json_files(gt_path, pred_path, pck_threshold, pck_relative=False):
+    """Compare one ground-truth JSON file with its prediction file.
+
+    Returns (stats, problem). stats is {label: [gt_count, errors, extra_count,
+    pck_hits]} where errors holds the distance of each matched point. A
+    missing prediction file counts every point as missed. problem is None,
+    or the reason the file was skipped (stats is then empty), so one bad
+    file does not end a dataset-wide run.
+    """
+    try:
+        with open(gt_path, 'r') as f:
+            gt_data = json.load(f)
+        pred_data = None
+        if pred_path and os.path.exists(pred_path):
+            with open(pred_path, 'r') as f:
+                pred_data = json.load(f)
+        
+        threshold = pck_threshold
+        if pck_relative:
+            diagonal = math.hypot(gt_data.get('imageWidth') or 0, gt_data.get('imageHeight') or 0)
+            if diagonal <= 0:
+                return {}, "no imageWidth/imageHeight for --pck-relative"
+            threshold *= diagonal
+        
+        matches, missed, extra = match_points(get_point_list(gt_data), get_point_list(pred_data))
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        return {}, f"{type(e).__name__}: {e}"
+    stats = {}
+    for gt_point, _, distance in matches:
+        entry = stats.setdefault(gt_point[1], [0, [], 0, 0])
+        entry[0] += 1
+        entry[1].append(distance)
+        entry[3] += distance <= threshold
+    for point in missed:
+        stats.setdefault(point[1], [0, [], 0, 0])[0] += 1
+    for point in extra:
+        stats.setdefault(point[1], [0, [], 0, 0])[2] += 1
+    return stats, None
+
+def compute_dataset_metrics(gt_folder, pred_folder, pck_threshold=5.0, pck_relative=False,
+                            workers=None):
+    """Compute per-label mean error and PCK over all ground-truth JSON files in parallel"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    gt_files = sorted(f for f in os.listdir(gt_folder) if f.endswith('.json'))
+    gt_paths = [os.path.join(gt_folder, f) for f in gt_files]
+    pred_paths = [os.path.join(pred_folder, f) for f in gt_files]
+    
+    totals = {}
+    skipped = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(compare_json_files, gt_paths, pred_paths,
+                               [pck_threshold] * len(gt_paths), [pck_relative] * len(gt_paths),
+                               chunksize=max(1, len(gt_paths) // 64))
+        for gt_file, (stats, problem) in zip(gt_files, results):
+            if problem:
+                skipped.append({'file': gt_file, 'reason': problem})
+            for label, (count, errors, extra, hits) in stats.items():
+                entry = totals.setdefault(label, [0, [], 0, 0])
+                entry[0] += count
+                entry[1].extend(errors)
+                entry[2] += extra
+                entry[3] += hits
+    
+    metrics = {'files': len(gt_files), 'skipped': skipped, 'labels': {}}
+    all_count = all_hits = 0
+    all_errors = []
+    for label in sorted(totals):
+        count, errors, extra, hits = totals[label]
+        metrics['labels'][label] = {
+            'count': count,
+            'matched': len(errors),
+            'extra': extra,
+            'mean_error': sum(errors) / len(errors) if errors else None,
+            'pck': hits / count if count else None,
+        }
+        all_count += count
+        all_hits += hits
+        all_errors.extend(errors)
+    metrics['overall'] = {
+        'count': all_count,
+        'matched': len(all_errors),
+        'mean_error': sum(all_errors) / len(all_errors) if all_errors else None,
+        'pck': all_hits / all_count if all_count else None,
+    }
+    return metrics
+
+def format_metrics(metrics):
+    """Format dataset metrics as a text table"""
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+    
+    lines = [f"{'Label':<24} {'Count':>7} {'Matched':>8} {'Extra':>6} {'Mean err':>9} {'PCK':>7}"]
+    for label, m in metrics['labels'].items():
+        lines.append(f"{label:<24} {m['count']:>7} {m['matched']:>8} {m['extra']:>6} "
+                     f"{fmt(m['mean_error'], '.2f'):>9} {fmt(m['pck'], '.3f'):>7}")
+    m = metrics['overall']
+    lines.append(f"{'ALL':<24} {m['count']:>7} {m['matched']:>8} {'':>6} "
+                 f"{fmt(m['mean_error'], '.2f'):>9} {fmt(m['pck'], '.3f'):>7}")
+    lines.append(f"{metrics['files']} files, {len(metrics['skipped'])} skipped")
+    for entry in metrics['skipped']:
+        lines.append(f"  skipped {entry['file']}: {entry['reason']}")
+    return "\n".join(lines)
 
 class LabelEditor:
     def __init__(self, root):
@@ -19,7 +720,27 @@ class LabelEditor:
         self.current_json_data = None
         self.display_image = None
         self.canvas_image = None
-        self.scale_factor = 1.0
+        self.scale_factor = 1.0  # display pixels per label coordinate unit
+        self.windowed_image = None
+        self.window_job = None
+        
+        # Comparison mode (prediction folder overlaid on the current labels)
+        self.compare_folder = ""
+        self.compare_json_data = None
+        self.comparison = None
+        
+        # Archive-backed dataset (None when reading a folder)
+        self.archive = None
+        self.overlay_dir = None
+        
+        # External change detection
+        self.folder_snapshot = None
+        self.current_json_stat = None  # (mtime_ns, size) when loaded or saved
+        self.seen_json_stat = None  # (mtime_ns, size) at the last poll
+        self.current_image_stat = None
+        self.unsaved_changes = False
+        self.watch_interval_ms = 1000
+        self.watch_job = None
         
         # UI Controls variables
         self.point_size = tk.IntVar(value=8)
@@ -40,6 +761,10 @@ class LabelEditor:
         self.click_start_x = 0
         self.click_start_y = 0
         
+        # Window/level variables (high-bit-depth images only)
+        self.window_low = tk.DoubleVar(value=0.0)
+        self.window_high = tk.DoubleVar(value=1.0)
+        
         # Setup UI
         self.setup_ui()
         
@@ -54,7 +779,9 @@ class LabelEditor:
         
         # Folder selection
         ttk.Button(controls_frame, text="Select Folder", 
-                  command=self.select_folder).pack(side=tk.LEFT, padx=(0, 10))
+                  command=self.select_folder).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(controls_frame, text="Open Archive", 
+                  command=self.select_archive).pack(side=tk.LEFT, padx=(0, 10))
         
         # File navigation
         self.file_label = ttk.Label(controls_frame, text="No folder selected")
@@ -124,7 +851,7 @@ class LabelEditor:
         # Font family
         ttk.Label(text_style_frame, text="Font:").pack(anchor=tk.W, padx=5, pady=(5, 0))
         font_combo = ttk.Combobox(text_style_frame, textvariable=self.text_font_family, 
-                                 values=["Arial", "Times New Roman", "Courier New", "Helvetica", "Verdana"],
+                                 values=FONT_FAMILIES,
                                  state="readonly")
         font_combo.pack(fill=tk.X, padx=5)
         font_combo.bind("<<ComboboxSelected>>", self.update_display)
@@ -135,7 +862,7 @@ class LabelEditor:
         color_frame.pack(fill=tk.X, padx=5)
         
         color_combo = ttk.Combobox(color_frame, textvariable=self.text_color,
-                                  values=["black", "white", "red", "blue", "green", "yellow", "orange", "purple"],
+                                  values=TEXT_COLORS,
                                   state="readonly", width=10)
         color_combo.pack(side=tk.LEFT)
         color_combo.bind("<<ComboboxSelected>>", self.update_display)
@@ -153,7 +880,7 @@ class LabelEditor:
         
         ttk.Label(text_style_frame, text="Stroke Color:").pack(anchor=tk.W, padx=5, pady=(10, 0))
         stroke_combo = ttk.Combobox(text_style_frame, textvariable=self.text_stroke_color,
-                                   values=["white", "black", "red", "blue", "green", "yellow", "orange", "purple"],
+                                   values=["white"] + [c for c in TEXT_COLORS if c != "white"],
                                    state="readonly")
         stroke_combo.pack(fill=tk.X, padx=5, pady=(0, 5))
         stroke_combo.bind("<<ComboboxSelected>>", self.update_display)
@@ -170,6 +897,38 @@ class LabelEditor:
         ttk.Button(zoom_frame, text="Fit", 
                   command=self.fit_to_canvas).pack(side=tk.LEFT)
         
+        # Window/level controls
+        window_frame = ttk.LabelFrame(right_frame, text="Window/Level")
+        window_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(window_frame, text="Low:").pack(anchor=tk.W, padx=5, pady=(5, 0))
+        self.window_low_scale = ttk.Scale(window_frame, from_=0, to=1, orient=tk.HORIZONTAL,
+                                          variable=self.window_low, command=self.schedule_window)
+        self.window_low_scale.pack(fill=tk.X, padx=5)
+        
+        ttk.Label(window_frame, text="High:").pack(anchor=tk.W, padx=5, pady=(10, 0))
+        self.window_high_scale = ttk.Scale(window_frame, from_=0, to=1, orient=tk.HORIZONTAL,
+                                           variable=self.window_high, command=self.schedule_window)
+        self.window_high_scale.pack(fill=tk.X, padx=5)
+        
+        ttk.Button(window_frame, text="Auto",
+                  command=self.auto_window).pack(anchor=tk.W, padx=5, pady=5)
+        
+        # Comparison controls
+        compare_frame = ttk.LabelFrame(right_frame, text="Comparison")
+        compare_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        compare_buttons = ttk.Frame(compare_frame)
+        compare_buttons.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Button(compare_buttons, text="Load Predictions",
+                  command=self.select_compare_folder).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(compare_buttons, text="Clear",
+                  command=self.clear_comparison).pack(side=tk.LEFT)
+        
+        self.compare_label = ttk.Label(compare_frame, text="No predictions loaded",
+                                       justify=tk.LEFT, wraplength=220)
+        self.compare_label.pack(anchor=tk.W, padx=5, pady=5)
+        
         # Label list and editing
         label_frame = ttk.LabelFrame(right_frame, text="Labels")
         label_frame.pack(fill=tk.BOTH, expand=True)
@@ -211,42 +970,91 @@ class LabelEditor:
         instructions.pack(side=tk.RIGHT, padx=(10, 0))
         
     def select_folder(self):
+        from tkinter import filedialog
         folder = filedialog.askdirectory(title="Select folder containing images and JSON files")
         if folder:
-            self.current_folder = folder
-            self.load_image_json_pairs()
-            if self.image_json_pairs:
-                self.current_pair_index = 0
-                self.load_current_pair()
+            self.open_folder(folder)
+            
+    def select_archive(self):
+        from tkinter import filedialog
+        archive = filedialog.askopenfilename(
+            title="Select archive containing images and JSON files",
+            filetypes=[("Archives", "*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz"),
+                       ("All files", "*.*")])
+        if archive:
+            self.open_folder(archive)
+            
+    def open_folder(self, folder, start=None, overlay_dir=None):
+        """Load the pairs in a folder or archive and show the pair given by start (name or 1-based index).
+
+        overlay_dir applies to this archive only; archives opened later use
+        their default overlay unless given one again.
+        """
+        self.current_folder = folder
+        self.overlay_dir = overlay_dir
+        self.load_image_json_pairs()
+        if not self.image_json_pairs:
+            return
+        self.current_pair_index = 0
+        index = None
+        if start is not None:
+            index = self.find_pair_index(start)
+            if index is not None:
+                self.current_pair_index = index
+        self.load_current_pair()
+        # Reported after loading so the load messages do not hide it
+        if start is not None and index is None:
+            self.update_status(f"Start file not found: {start} - showing the first pair")
+        
+    def find_pair_index(self, start):
+        """Resolve a pair name, file name or 1-based index to a pair index"""
+        start = str(start)
+        basename = os.path.basename(start)
+        # Base names may contain dots (x.cam1), so try the name as given
+        # before stripping an extension
+        for name in (basename, os.path.splitext(basename)[0]):
+            for i, pair in enumerate(self.image_json_pairs):
+                if pair['name'] == name:
+                    return i
+        if start.isdigit() and 1 <= int(start) <= len(self.image_json_pairs):
+            return int(start) - 1
+        return None
             
     def load_image_json_pairs(self):
         """Find all image-JSON pairs in the selected folder"""
         self.image_json_pairs = []
         
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+        self.folder_snapshot = None
+        
         if not self.current_folder:
             return
             
-        # Get all JSON files
-        json_files = [f for f in os.listdir(self.current_folder) if f.endswith('.json')]
+        if os.path.isfile(self.current_folder):
+            try:
+                self.archive = ArchiveDataset(self.current_folder, self.overlay_dir)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to open archive: {str(e)}")
+                return
+            self.image_json_pairs = self.archive.pairs()
+            self.update_status(f"Found {len(self.image_json_pairs)} image-JSON pairs in archive")
+            return
+            
+        # One directory listing; image lookups are set membership tests
+        # instead of a stat call per JSON file and extension. The listing is
+        # kept so later polls only re-examine entries that changed.
+        self.folder_snapshot = FolderSnapshot(self.current_folder)
+        existing = self.folder_snapshot.entries
+        json_files = [f for f in existing if f.endswith('.json')]
         
         for json_file in json_files:
-            # Find corresponding image file
-            base_name = os.path.splitext(json_file)[0]
-            image_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']
-            
-            for ext in image_extensions:
-                image_file = base_name + ext
-                image_path = os.path.join(self.current_folder, image_file)
-                
-                if os.path.exists(image_path):
-                    json_path = os.path.join(self.current_folder, json_file)
-                    self.image_json_pairs.append({
-                        'image': image_path,
-                        'json': json_path,
-                        'name': base_name
-                    })
-                    break
+            pair = make_pair(self.current_folder, os.path.splitext(json_file)[0], existing)
+            if pair:
+                self.image_json_pairs.append(pair)
         
+        self.start_folder_watch()
         self.update_status(f"Found {len(self.image_json_pairs)} image-JSON pairs")
         
     def load_current_pair(self):
@@ -257,29 +1065,199 @@ class LabelEditor:
         pair = self.image_json_pairs[self.current_pair_index]
         
         # Update file label
-        self.file_label.config(text=f"{self.current_pair_index + 1}/{len(self.image_json_pairs)}: {pair['name']}")
+        self.update_file_label()
         
         # Load image
         try:
-            self.current_image = Image.open(pair['image'])
+            self.current_image_stat = self.pair_image_stat(pair)
+            self.current_image, self.windowed_image, self.scale_factor = self.open_pair_image(pair)
+            self.reset_window_controls()
             self.update_status(f"Loaded image: {os.path.basename(pair['image'])}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load image: {str(e)}")
             return
             
         # Load JSON
+        if not self.load_current_json():
+            return
+            
+        # Update displays
+        self.zoom_factor = 1.0  # Reset zoom when loading new image
+        self.update_label_list()
+        self.update_display()
+        
+    def load_current_json(self):
+        """Load the JSON of the current pair, returning False on failure"""
+        pair = self.image_json_pairs[self.current_pair_index]
         try:
-            with open(pair['json'], 'r') as f:
-                self.current_json_data = json.load(f)
+            self.current_json_stat = self.seen_json_stat = self.pair_json_stat(pair)
+            self.current_json_data = self.read_pair_json(pair)
+            self.unsaved_changes = False
             self.update_status(f"Loaded JSON: {os.path.basename(pair['json'])}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load JSON: {str(e)}")
+            return False
+            
+        self.load_compare_json()
+        return True
+        
+    def open_pair_image(self, pair):
+        """Open the image of a pair from the folder or archive"""
+        if self.archive:
+            with self.archive.open_member(pair['image']) as fp:
+                return open_display_image(pair['image'], fp)
+        return open_display_image(pair['image'])
+        
+    def read_pair_json(self, pair):
+        if self.archive:
+            return self.archive.read_json(pair['json'])
+        with open(pair['json'], 'r') as f:
+            return json.load(f)
+            
+    def write_pair_json(self, pair, data):
+        if self.archive:
+            self.archive.write_json(pair['json'], data)
             return
+        with open(pair['json'], 'w') as f:
+            json.dump(data, f, indent=2)
             
-        # Update displays
-        self.zoom_factor = 1.0  # Reset zoom when loading new image
-        self.update_label_list()
+    def pair_image_stat(self, pair):
+        """Return the (mtime_ns, size) of a pair's image, or None for archive members"""
+        if self.archive:
+            return None
+        return file_stat(pair['image'])
+        
+    def pair_json_stat(self, pair):
+        """Return the (mtime_ns, size) of the file a pair's JSON is saved to"""
+        if self.archive:
+            return file_stat(self.archive.overlay_path(pair['json']))
+        return file_stat(pair['json'])
+        
+    def update_file_label(self):
+        if not self.image_json_pairs:
+            self.file_label.config(text="No image-JSON pairs")
+            return
+        pair = self.image_json_pairs[self.current_pair_index]
+        self.file_label.config(text=f"{self.current_pair_index + 1}/{len(self.image_json_pairs)}: {pair['name']}")
+        
+    def start_folder_watch(self):
+        """(Re)start polling the current folder for external changes"""
+        if self.watch_job:
+            self.root.after_cancel(self.watch_job)
+        self.watch_job = self.root.after(self.watch_interval_ms, self.poll_folder)
+        
+    def poll_folder(self):
+        """Merge added/removed pairs and reload the current pair if it changed on disk"""
+        self.watch_job = None
+        if not self.folder_snapshot:
+            return
+            
+        added, removed = self.folder_snapshot.poll()
+        if added or removed:
+            self.merge_pair_changes(added, removed)
+            
+        if self.image_json_pairs and self.current_json_data is not None:
+            pair = self.image_json_pairs[self.current_pair_index]
+            # Each version on disk is handled once; current_json_stat stays at
+            # the loaded version so saving still warns after a declined reload
+            json_stat = file_stat(pair['json'])
+            if json_stat is not None and json_stat != self.seen_json_stat:
+                self.seen_json_stat = json_stat
+                if json_stat != self.current_json_stat:
+                    self.on_current_json_changed()
+            image_stat = self.pair_image_stat(pair)
+            if image_stat is not None and image_stat != self.current_image_stat:
+                self.reload_current_image()
+                
+        self.watch_job = self.root.after(self.watch_interval_ms, self.poll_folder)
+        
+    def merge_pair_changes(self, added, removed):
+        """Update the pair list for added and removed entries without a full rescan"""
+        names = self.folder_snapshot.entries
+        affected = {os.path.splitext(name)[0] for name in added | removed}
+        current = self.image_json_pairs[self.current_pair_index] if self.image_json_pairs else None
+        
+        pairs = []
+        known = set()
+        for pair in self.image_json_pairs:
+            known.add(pair['name'])
+            if pair['name'] in affected:
+                new_pair = make_pair(self.current_folder, pair['name'], names)
+                if new_pair is None and pair is current and not self.confirm_discard_edits(
+                        f"{pair['name']} (image or JSON) was removed on disk",
+                        "Close it and discard your edits?"):
+                    # Keep the open pair so the edits can still be saved
+                    new_pair = pair
+                    self.update_status(f"Conflict: {pair['name']} removed on disk - "
+                                       "kept open so your edits can be saved")
+                pair = new_pair
+            if pair:
+                pairs.append(pair)
+        new_pairs = [make_pair(self.current_folder, name, names) for name in sorted(affected - known)]
+        new_pairs = [pair for pair in new_pairs if pair]
+        pairs.extend(new_pairs)
+        
+        removed_count = len(self.image_json_pairs) + len(new_pairs) - len(pairs)
+        self.image_json_pairs = pairs
+        if not new_pairs and not removed_count and (current is None or current in pairs):
+            return
+        self.update_status(f"Folder changed: {len(new_pairs)} pairs added, {removed_count} removed")
+        
+        index = None
+        if current is not None:
+            index = next((i for i, pair in enumerate(pairs) if pair['name'] == current['name']), None)
+        if index is not None:
+            self.current_pair_index = index
+            self.update_file_label()
+            if pairs[index]['image'] != current['image']:
+                # Another image now pairs with the open JSON; keep the labels
+                # (and any unsaved edits) and only swap the image
+                self.reload_current_image()
+        elif pairs:
+            # The open pair was removed (or nothing was open)
+            self.current_pair_index = min(self.current_pair_index, len(pairs) - 1) if current else 0
+            self.load_current_pair()
+        else:
+            self.current_pair_index = 0
+            self.current_image = None
+            self.current_json_data = None
+            self.unsaved_changes = False
+            self.canvas.delete("all")
+            self.label_listbox.delete(0, tk.END)
+            self.update_file_label()
+            
+    def confirm_discard_edits(self, reason, question):
+        """Return True if there are no unsaved edits or the user agrees to discard them"""
+        if not self.unsaved_changes:
+            return True
+        return messagebox.askyesno("Conflict",
+                                   f"{reason} and you have unsaved edits.\n\n{question}")
+        
+    def on_current_json_changed(self):
+        """Reload the current JSON after an external change, asking first if there are unsaved edits"""
+        pair = self.image_json_pairs[self.current_pair_index]
+        name = os.path.basename(pair['json'])
+        if not self.confirm_discard_edits(f"{name} was changed on disk",
+                                          "Reload it and discard your edits?"):
+            self.update_status(f"Conflict: {name} changed on disk - saving will ask before overwriting")
+            return
+        if self.load_current_json():
+            self.update_label_list()
+            self.update_display()
+            self.update_status(f"Reloaded {name} (changed on disk)")
+            
+    def reload_current_image(self):
+        """Reload the current image after an external change, keeping zoom and labels"""
+        pair = self.image_json_pairs[self.current_pair_index]
+        try:
+            self.current_image_stat = self.pair_image_stat(pair)
+            self.current_image, self.windowed_image, self.scale_factor = self.open_pair_image(pair)
+            self.reset_window_controls()
+        except Exception as e:
+            self.update_status(f"Failed to reload image: {str(e)}")
+            return
         self.update_display()
+        self.update_status(f"Reloaded {os.path.basename(pair['image'])} (changed on disk)")
         
     def update_label_list(self):
         """Update the label listbox with current labels"""
@@ -301,6 +1279,8 @@ class LabelEditor:
         if not self.current_image or not self.current_json_data:
             return
             
+        from PIL import Image, ImageTk, ImageDraw
+        
         # Create a copy of the image to draw on
         display_img = self.current_image.copy()
         draw = ImageDraw.Draw(display_img)
@@ -311,6 +1291,22 @@ class LabelEditor:
         point_radius = self.point_size.get()
         stroke_width = self.text_stroke_width.get()
         
+        # Draw predictions underneath the labels, joined to their matches
+        if self.comparison:
+            matches, missed, extra = self.comparison
+            for gt_point, pred_point, _ in matches:
+                gx, gy = gt_point[2] * self.scale_factor, gt_point[3] * self.scale_factor
+                px, py = pred_point[2] * self.scale_factor, pred_point[3] * self.scale_factor
+                draw.line([gx, gy, px, py], fill='orange', width=2)
+                draw.ellipse([px - point_radius, py - point_radius,
+                              px + point_radius, py + point_radius],
+                             outline='orange', width=3)
+            for pred_point in extra:
+                px, py = pred_point[2] * self.scale_factor, pred_point[3] * self.scale_factor
+                draw.ellipse([px - point_radius, py - point_radius,
+                              px + point_radius, py + point_radius],
+                             outline='magenta', width=3)
+        
         # Draw all points and labels
         if 'shapes' in self.current_json_data:
             for i, shape in enumerate(self.current_json_data['shapes']):
@@ -318,6 +1314,8 @@ class LabelEditor:
                     points = shape['points']
                     if points:
                         x, y = points[0]
+                        x *= self.scale_factor
+                        y *= self.scale_factor
                         label = shape.get('label', 'Unknown')
                         
                         # Choose color based on selection
@@ -410,8 +1408,10 @@ class LabelEditor:
             
         # Update the label
         self.current_json_data['shapes'][selected_idx]['label'] = new_label
+        self.unsaved_changes = True
         
         # Refresh displays
+        self.update_comparison()
         self.update_label_list()
         self.update_display()
         
@@ -428,6 +1428,8 @@ class LabelEditor:
         
     def get_styled_font(self):
         """Get a font with the current styling settings"""
+        from PIL import ImageFont
+        
         font_size = self.text_size.get()
         font_family = self.text_font_family.get()
         is_bold = self.text_bold.get()
@@ -475,16 +1477,120 @@ class LabelEditor:
             # Ultimate fallback - create a basic font
             return ImageFont.load_default()
         
+    def select_compare_folder(self):
+        from tkinter import filedialog
+        folder = filedialog.askdirectory(title="Select folder containing prediction JSON files")
+        if folder:
+            self.set_compare_folder(folder)
+            
+    def set_compare_folder(self, folder):
+        """Overlay the JSON files with matching names from folder on the current labels"""
+        self.compare_folder = folder
+        self.load_compare_json()
+        self.update_display()
+        
+    def clear_comparison(self):
+        """Leave comparison mode"""
+        self.compare_folder = ""
+        self.load_compare_json()
+        self.update_display()
+        
+    def load_compare_json(self):
+        """Load the prediction JSON for the current pair and match it to the labels"""
+        self.compare_json_data = None
+        if self.compare_folder and self.image_json_pairs:
+            pair = self.image_json_pairs[self.current_pair_index]
+            compare_path = os.path.join(self.compare_folder, pair['name'] + '.json')
+            if os.path.exists(compare_path):
+                try:
+                    with open(compare_path, 'r') as f:
+                        self.compare_json_data = json.load(f)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to load prediction JSON: {str(e)}")
+        self.update_comparison()
+        
+    def update_comparison(self):
+        """Match predictions to the current labels and show the error statistics"""
+        if not self.compare_folder:
+            self.comparison = None
+            self.compare_label.config(text="No predictions loaded")
+            return
+        if self.compare_json_data is None:
+            self.comparison = None
+            self.compare_label.config(text="No prediction file for this image")
+            return
+        
+        gt_points = get_point_list(self.current_json_data)
+        self.comparison = match_points(gt_points, get_point_list(self.compare_json_data))
+        matches, missed, extra = self.comparison
+        
+        lines = [f"Matched: {len(matches)}/{len(gt_points)}"]
+        if matches:
+            errors = [distance for _, _, distance in matches]
+            worst = max(matches, key=lambda m: m[2])
+            lines.append(f"Mean error: {sum(errors) / len(errors):.2f} px")
+            lines.append(f"Max error: {worst[2]:.2f} px ({worst[0][1]})")
+        lines.append(f"Missing: {len(missed)} | Extra: {len(extra)}")
+        self.compare_label.config(text="\n".join(lines))
+        
+    def reset_window_controls(self):
+        """Set the window/level sliders to the range and auto window of the current image"""
+        if not self.windowed_image:
+            return
+        low, high = self.windowed_image.auto_window
+        self.window_low_scale.configure(from_=self.windowed_image.min_value,
+                                        to=self.windowed_image.max_value)
+        self.window_high_scale.configure(from_=self.windowed_image.min_value,
+                                         to=self.windowed_image.max_value)
+        self.window_low.set(low)
+        self.window_high.set(high)
+        
+    def schedule_window(self, event=None):
+        """Coalesce window/level slider motion into a single re-render"""
+        if self.window_job:
+            self.root.after_cancel(self.window_job)
+        self.window_job = self.root.after(WINDOW_UPDATE_DELAY_MS, self.apply_window)
+        
+    def apply_window(self, event=None):
+        """Re-render the current high-bit-depth image with the slider window"""
+        if self.window_job:
+            self.root.after_cancel(self.window_job)
+            self.window_job = None
+        if not self.windowed_image:
+            return
+        low = self.window_low.get()
+        high = self.window_high.get()
+        if high <= low:
+            high = low + self.windowed_image.step
+        self.current_image = self.windowed_image.render(low, high)
+        self.update_display()
+        self.update_status(f"Window: {low:.4g} - {high:.4g}")
+        
+    def auto_window(self):
+        """Restore the percentile auto-contrast window"""
+        if not self.windowed_image:
+            return
+        self.reset_window_controls()
+        self.apply_window()
+        
     def save_changes(self):
         """Save the current JSON data"""
         if not self.current_json_data or not self.image_json_pairs:
             messagebox.showwarning("Warning", "No data to save")
             return
             
+        pair = self.image_json_pairs[self.current_pair_index]
+        disk_stat = self.pair_json_stat(pair)
+        if disk_stat is not None and disk_stat != self.current_json_stat:
+            if not messagebox.askyesno("Conflict",
+                                       f"{os.path.basename(pair['json'])} was changed on disk since it was loaded.\n\n"
+                                       "Overwrite it with your changes?"):
+                return
+            
         try:
-            pair = self.image_json_pairs[self.current_pair_index]
-            with open(pair['json'], 'w') as f:
-                json.dump(self.current_json_data, f, indent=2)
+            self.write_pair_json(pair, self.current_json_data)
+            self.current_json_stat = self.seen_json_stat = self.pair_json_stat(pair)
+            self.unsaved_changes = False
             
             self.update_status(f"Saved changes to {os.path.basename(pair['json'])}")
             messagebox.showinfo("Success", "Changes saved successfully!")
@@ -725,6 +1831,10 @@ class LabelEditor:
         img_x = canvas_x / self.zoom_factor if self.zoom_factor > 0 else canvas_x
         img_y = canvas_y / self.zoom_factor if self.zoom_factor > 0 else canvas_y
         
+        # Account for decimated previews of large images
+        img_x /= self.scale_factor
+        img_y /= self.scale_factor
+        
         # Find closest point
         closest_index = -1
         min_distance = float('inf')
@@ -763,10 +1873,135 @@ class LabelEditor:
             
             self.update_display()
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Label Point Editor for LabelMe point labels")
+    parser.add_argument("folder", nargs="?",
+                        help="folder or zip/tar archive containing image and JSON files "
+                             "(skips the folder dialog)")
+    parser.add_argument("--start",
+                        help="pair to open first: file name, base name or 1-based index")
+    parser.add_argument("--zoom",
+                        help="initial zoom factor (0.1-10) or 'fit'")
+    parser.add_argument("--point-size", type=int, help="point radius in pixels (3-20)")
+    parser.add_argument("--text-size", type=int, help="label text size (8-48)")
+    parser.add_argument("--font", choices=FONT_FAMILIES, help="label font family")
+    parser.add_argument("--text-color", choices=TEXT_COLORS, help="label text color")
+    parser.add_argument("--bold", action="store_true", help="draw labels in bold")
+    parser.add_argument("--stroke-width", type=int, help="label stroke width (0-5)")
+    parser.add_argument("--stroke-color", choices=TEXT_COLORS, help="label stroke color")
+    parser.add_argument("--timing", action="store_true",
+                        help="print the startup time to stderr")
+    parser.add_argument("--compare", metavar="PRED_FOLDER",
+                        help="folder of prediction JSON files to compare with the labels")
+    parser.add_argument("--metrics", action="store_true",
+                        help="compute dataset metrics for --compare without opening the window")
+    parser.add_argument("--pck-threshold", type=float, default=5.0,
+                        help="PCK distance threshold in pixels (default: 5)")
+    parser.add_argument("--pck-relative", action="store_true",
+                        help="treat --pck-threshold as a fraction of the image diagonal")
+    parser.add_argument("--workers", type=int,
+                        help="number of worker processes for --metrics")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="also write the --metrics results to a JSON file")
+    parser.add_argument("--overlay", metavar="DIR",
+                        help="directory for JSON files saved from an archive "
+                             "(default: <archive>.overlay)")
+    parser.add_argument("--rebuild-archive", metavar="OUTPUT",
+                        help="write a copy of the archive with the saved JSON files "
+                             "without opening the window")
+    args = parser.parse_args(argv)
+    if args.zoom is not None and args.zoom != "fit":
+        try:
+            args.zoom = min(10.0, max(0.1, float(args.zoom)))
+        except ValueError:
+            parser.error(f"invalid --zoom value: {args.zoom}")
+    if args.metrics and not (args.folder and args.compare):
+        parser.error("--metrics requires a folder and --compare")
+    if args.rebuild_archive and not args.folder:
+        parser.error("--rebuild-archive requires an archive")
+    return args
+
+def apply_args(app, args):
+    """Apply command-line styling and open the requested folder"""
+    if args.point_size is not None:
+        app.point_size.set(args.point_size)
+    if args.text_size is not None:
+        app.text_size.set(args.text_size)
+    if args.font:
+        app.text_font_family.set(args.font)
+    if args.text_color:
+        app.text_color.set(args.text_color)
+    if args.bold:
+        app.text_bold.set(True)
+    if args.stroke_width is not None:
+        app.text_stroke_width.set(args.stroke_width)
+    if args.stroke_color:
+        app.text_stroke_color.set(args.stroke_color)
+        
+    if args.folder:
+        if not os.path.isdir(args.folder) and not is_archive(args.folder):
+            messagebox.showerror("Error", f"Folder or archive not found: {args.folder}")
+            return
+        app.open_folder(args.folder, args.start, args.overlay)
+        if args.compare:
+            app.set_compare_folder(args.compare)
+        if args.zoom == "fit":
+            # The canvas needs its real size before it can be fitted
+            app.root.update_idletasks()
+            app.fit_to_canvas()
+        elif args.zoom is not None:
+            app.zoom_factor = args.zoom
+            app.update_display()
+
+def report_startup(app, args):
+    """Report the time from the start of this script until the first pair is on screen"""
+    elapsed_ms = (time.perf_counter() - _START_TIME) * 1000
+    app.update_status(f"{app.status_bar.cget('text')} | Startup: {elapsed_ms:.0f} ms")
+    if args.timing:
+        print(f"startup: {elapsed_ms:.1f} ms", file=sys.stderr)
+
+def run_metrics(args):
+    """Headless dataset comparison for --metrics"""
+    for folder in (args.folder, args.compare):
+        if not os.path.isdir(folder):
+            print(f"Folder not found: {folder}", file=sys.stderr)
+            return 1
+    metrics = compute_dataset_metrics(args.folder, args.compare, args.pck_threshold,
+                                      args.pck_relative, args.workers)
+    print(format_metrics(metrics))
+    if args.metrics_json:
+        with open(args.metrics_json, 'w') as f:
+            json.dump(metrics, f, indent=2)
+    return 0
+
+def run_rebuild_archive(args):
+    """Headless archive rebuild for --rebuild-archive"""
+    if not is_archive(args.folder):
+        print(f"Not a zip or tar archive: {args.folder}", file=sys.stderr)
+        return 1
+    archive = ArchiveDataset(args.folder, args.overlay)
+    try:
+        replaced = archive.rebuild(args.rebuild_archive)
+    finally:
+        archive.close()
+    print(f"Wrote {args.rebuild_archive} ({replaced} JSON files from {archive.overlay_dir})")
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        return run_metrics(args)
+    if args.rebuild_archive:
+        return run_rebuild_archive(args)
     root = tk.Tk()
     app = LabelEditor(root)
+    # Open data once the window is mapped so it appears without waiting on
+    # the folder scan and image decode
+    def open_data():
+        apply_args(app, args)
+        root.after_idle(report_startup, app, args)
+    root.after_idle(open_data)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())